@@ -0,0 +1,58 @@
+"""File-backed caches for Polygon responses."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import orjson
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+def _key(url: str, params: Dict[str, Any]) -> str:
+    raw = url + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+
+def cached_get(
+    url: str,
+    params: Dict[str, Any],
+    ttl: float,
+    fetch: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+) -> Dict[str, Any]:
+    path = CACHE_DIR / f"{_key(url, params)}.json"
+    try:
+        entry = orjson.loads(path.read_bytes())
+        if time.time() - entry["ts"] < entry["ttl"]:
+            return entry["body"]
+        path.unlink(missing_ok=True)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    body = fetch(url, params)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(path)
+    tmp.write_bytes(orjson.dumps({"ts": time.time(), "ttl": ttl, "body": body}))
+    os.replace(tmp, path)
+    return body
+
+def cached_frame(path: Path, fetch: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Parquet cache with no expiry, for data that never changes once published."""
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError):
+        pass
+
+    df = fetch()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(path)
+    df.to_parquet(tmp, compression="zstd", index=False)
+    os.replace(tmp, path)
+    return df
@@ -4,125 +4,119 @@ Fetches top gaining U.S. stocks from Polygon and prints a ranked trade plan tabl
 
 from __future__ import annotations
 
-import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, Tuple
+from zoneinfo import ZoneInfo
 
 import pandas as pd
-import requests
-from dotenv import load_dotenv
 
-load_dotenv()
-
-API_KEY = os.getenv("POLYGON_API_KEY")
-if not API_KEY:
-    raise EnvironmentError("POLYGON_API_KEY not found in environment.")
-
-BASE_URL = "https://api.polygon.io"
-
-def _get(url: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    params = params or {}
-    params["apiKey"] = API_KEY
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    return r.json()
-
-def fetch_top_gainers() -> List[Dict[str, Any]]:
-    data = _get(f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/gainers")
-    return data.get("tickers", [])
-
-def fetch_ticker_snapshot(ticker: str) -> Dict[str, Any]:
-    data = _get(f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}")
-    return data.get("ticker", {})
-
-def fetch_market_cap(ticker: str) -> float | None:
-    data = _get(f"{BASE_URL}/v3/reference/tickers/{ticker}")
-    return data.get("results", {}).get("market_cap")
-
-def fetch_avg_volume(ticker: str, days: int = 30) -> float | None:
-    end = datetime.utcnow()
-    start = end - timedelta(days=days)
-    url = f"{BASE_URL}/v2/aggs/ticker/{ticker}/range/1/day/{start:%Y-%m-%d}/{end:%Y-%m-%d}"
-    data = _get(url, params={"adjusted": "true", "limit": 120, "sort": "desc"})
-    results = data.get("results", [])
-    if not results:
-        return None
-    vols = [r.get("v", 0) for r in results[-days:]]
-    return sum(vols) / len(vols) if vols else None
-
-def fetch_latest_news(ticker: str) -> str:
-    data = _get(f"{BASE_URL}/v2/reference/news", params={"ticker": ticker, "order": "desc", "limit": 1})
-    results = data.get("results", [])
-    return results[0].get("title", "") if results else ""
-
-def compute_trade_plan(price: float, vwap: float) -> Dict[str, Any]:
-    entry = price
-    stop = round(price * 0.97, 2)
-    target1 = round(price * 1.05, 2)
-    target2 = round(price * 1.10, 2)
-    rr = round((target1 - entry) / (entry - stop), 2) if entry != stop else 0
-    entry_zone = f"{vwap*0.99:.2f}-{vwap*1.01:.2f}" if vwap else ""
-    return {
-        "EntryZone": entry_zone,
+from polygon_client import (
+    MAX_WORKERS,
+    fetch_grouped_history,
+    fetch_news_bulk,
+    fetch_shares_outstanding,
+    fetch_ticker_snapshots,
+    fetch_top_gainers,
+)
+
+NY = ZoneInfo("America/New_York")
+NEWS_LOOKBACK_DAYS = 7
+
+MIN_PRICE, MAX_PRICE = 1, 20
+MIN_CHANGE = 10
+MIN_RVOL = 3
+MAX_MCAP = 1_000_000_000
+MIN_VOLUME = 200_000
+
+def avg_volumes(history: pd.DataFrame) -> Dict[str, float]:
+    return history["v"].fillna(0).groupby(history["T"]).mean().to_dict()
+
+def compute_trade_plan(price: pd.Series, vwap: pd.Series) -> pd.DataFrame:
+    stop = (price * 0.97).round(2)
+    target1 = (price * 1.05).round(2)
+    target2 = (price * 1.10).round(2)
+    rr = ((target1 - price) / (price - stop)).round(2).where(price != stop, 0)
+    entry_zone = (vwap * 0.99).map("{:.2f}".format) + "-" + (vwap * 1.01).map("{:.2f}".format)
+    return pd.DataFrame({
+        "EntryZone": entry_zone.where(vwap.notna(), ""),
         "Stop": stop,
         "Target1": target1,
         "Target2": target2,
         "R:R": rr,
-    }
+    })
 
-def confidence_score(pct_change: float, rvol: float) -> int:
+def confidence_score(pct_change: pd.Series, rvol: pd.Series) -> pd.Series:
     score = 5 + (pct_change - 10) / 10 + (rvol - 3) * 0.5
-    return int(max(1, min(10, round(score))))
+    return score.round().clip(1, 10).astype(int)
 
-def main() -> None:
-    gainers = fetch_top_gainers()
-    rows: List[Dict[str, Any]] = []
-    for g in gainers:
-        ticker = g.get("ticker")
-        if not ticker:
-            continue
-        price = g.get("lastTrade", {}).get("p") or g.get("day", {}).get("c")
-        pct_change = g.get("todaysChangePerc", 0)
-        volume = g.get("day", {}).get("v")
-        vwap = g.get("day", {}).get("vw")
+RAW_COLUMNS = ("Ticker", "Price", "%Chg", "Vol", "RVOL(30d)", "MktCap", "VWAP")
+COLUMNS = (
+    "Ticker", "Price", "%Chg", "Vol", "RVOL(30d)", "MktCap", ">VWAP", "VWAP",
+    "EntryZone", "Stop", "Target1", "Target2", "R:R", "Confidence",
+)
+
+def process_gainer(g: Dict[str, Any], avg_vols: Dict[str, float]) -> Tuple[Any, ...] | None:
+    ticker = g.get("ticker")
+    if not ticker:
+        return None
+    price = g.get("lastTrade", {}).get("p") or g.get("day", {}).get("c")
+    pct_change = g.get("todaysChangePerc", 0)
+    volume = g.get("day", {}).get("v")
+    vwap = g.get("day", {}).get("vw")
 
-        mcap = fetch_market_cap(ticker)
-        avg_vol = fetch_avg_volume(ticker)
-        if not all([price, pct_change is not None, volume, avg_vol, mcap]):
-            continue
-        rvol = round(volume / avg_vol, 2) if avg_vol else None
-        snapshot = fetch_ticker_snapshot(ticker)
-        vwap = vwap or snapshot.get("day", {}).get("vw")
-        trade = compute_trade_plan(price, vwap)
-        catalyst = fetch_latest_news(ticker)
-        above_vwap = price > vwap if vwap else False
-        conf = confidence_score(pct_change, rvol) if rvol is not None else 1
+    if not price or pct_change is None or not volume:
+        return None
+    # Apply the table filters that need no extra request before making any;
+    # compare rounded values exactly as the final filter will.
+    if not MIN_PRICE <= round(price, 2) <= MAX_PRICE or round(pct_change, 2) < MIN_CHANGE or volume < MIN_VOLUME:
+        return None
+    avg_vol = avg_vols.get(ticker)
+    if not avg_vol:
+        return None
+    rvol = round(volume / avg_vol, 2)
+    if rvol < MIN_RVOL:
+        return None
+    # Share counts move quarterly and are cached for 30 days; price them live.
+    shares = fetch_shares_outstanding(ticker)
+    if not shares:
+        return None
+    mcap = shares * price
+    return ticker, price, pct_change, volume, rvol, mcap, vwap
 
-        rows.append({
-            "Ticker": ticker,
-            "Price": round(price, 2),
-            "%Chg": round(pct_change, 2),
-            "Vol": int(volume),
-            "RVOL(30d)": round(rvol, 2) if rvol else None,
-            "MktCap": int(mcap) if mcap else None,
-            ">VWAP": above_vwap,
-            "VWAP": round(vwap, 2) if vwap else None,
-            **trade,
-            "Confidence": conf,
-            "Catalyst": catalyst,
-        })
-    df = pd.DataFrame(rows)
+def main() -> None:
+    today = datetime.now(tz=NY).date()
+    gainers = fetch_top_gainers()
+    avg_vols = avg_volumes(fetch_grouped_history(today))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        rows = [row for row in pool.map(lambda g: process_gainer(g, avg_vols), gainers) if row]
+    # The gainers payload nearly always carries VWAP; snapshot only the few that lack it.
+    snapshots = fetch_ticker_snapshots([row[0] for row in rows if not row[-1]])
+    rows = [row[:-1] + (row[-1] or snapshots.get(row[0], {}).get("day", {}).get("vw"),) for row in rows]
+    # Transpose row tuples into column lists so pandas builds each column once.
+    df = pd.DataFrame(dict(zip(RAW_COLUMNS, map(list, zip(*rows)))))
     if df.empty:
         print("No data returned from Polygon API.")
         return
+    df = df.astype({"Price": "float64", "%Chg": "float64", "RVOL(30d)": "float64", "VWAP": "float64"})
+    df["VWAP"] = df["VWAP"].where(df["VWAP"] != 0)
+    df[">VWAP"] = df["Price"] > df["VWAP"]
+    df = df.join(compute_trade_plan(df["Price"], df["VWAP"]))
+    df["Confidence"] = confidence_score(df["%Chg"], df["RVOL(30d)"])
+    df = df[list(COLUMNS)].astype({"Vol": "int64", "MktCap": "int64"})
+    rounded = ["Price", "%Chg", "RVOL(30d)", "VWAP"]
+    df[rounded] = df[rounded].round(2)
     filtered = df[
-        (df["Price"].between(1, 20))
-        & (df["%Chg"] >= 10)
-        & (df["RVOL(30d)"] >= 3)
-        & (df["MktCap"] <= 1_000_000_000)
-        & (df["Vol"] >= 200_000)
+        (df["Price"].between(MIN_PRICE, MAX_PRICE))
+        & (df["%Chg"] >= MIN_CHANGE)
+        & (df["RVOL(30d)"] >= MIN_RVOL)
+        & (df["MktCap"] <= MAX_MCAP)
+        & (df["Vol"] >= MIN_VOLUME)
     ]
     filtered = filtered.sort_values("%Chg", ascending=False)
+    tickers = filtered["Ticker"].tolist()
+    news = fetch_news_bulk(tickers, today - timedelta(days=NEWS_LOOKBACK_DAYS))
+    filtered["Catalyst"] = [news[t][0].get("title", "") if t in news else "" for t in tickers]
     print(filtered.to_string(index=False))
 
 if __name__ == "__main__":
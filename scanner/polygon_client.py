@@ -0,0 +1,142 @@
+"""Polygon REST client shared by the scanner scripts.
+
+One pooled session, the response caches from `_cache`, and the `fetch_*` helpers."""
+
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import orjson
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _cache import CACHE_DIR, cached_frame, cached_get
+
+load_dotenv()
+
+API_KEY = os.getenv("POLYGON_API_KEY")
+if not API_KEY:
+    raise EnvironmentError("POLYGON_API_KEY not found in environment.")
+
+BASE_URL = "https://api.polygon.io"
+MAX_WORKERS = 20
+GROUPED_COLUMNS = ["T", "o", "h", "l", "c", "v", "vw"]
+GROUPED_CACHE_DIR = CACHE_DIR / "grouped"
+NEWS_BATCH = 50
+
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=5, backoff_factor=1, status_forcelist=[429, 502, 503, 504], raise_on_status=False),
+))
+
+DAY = 24 * 60 * 60
+# Disk-cache TTLs matched to how often each endpoint's data changes; anything
+# not listed (snapshots, gainers, grouped daily bars) is fetched live here.
+CACHE_TTLS = [
+    (re.compile(r"/v3/reference/tickers/[^/]+$"), 30 * DAY),
+    (re.compile(r"/v2/reference/news$"), 60 * 60),
+]
+
+def _cache_ttl(url: str) -> float:
+    for pattern, ttl in CACHE_TTLS:
+        if pattern.search(url):
+            return ttl
+    return 0
+
+def _get(url: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    params = dict(params or {})
+    ttl = _cache_ttl(url)
+    if ttl:
+        return cached_get(url, params, ttl, _fetch)
+    return _fetch(url, params)
+
+def _fetch(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    params = {**params, "apiKey": API_KEY}
+    r = SESSION.get(url, params=params, timeout=10)
+    r.raise_for_status()
+    return orjson.loads(r.content)
+
+def fetch_top_gainers() -> List[Dict[str, Any]]:
+    data = _get(f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/gainers")
+    return data.get("tickers", [])
+
+def fetch_ticker_snapshots(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    if not tickers:
+        return {}
+    data = _get(f"{BASE_URL}/v2/snapshot/locale/us/markets/stocks/tickers", params={"tickers": ",".join(tickers)})
+    return {t.get("ticker"): t for t in data.get("tickers", [])}
+
+def fetch_shares_outstanding(ticker: str) -> float | None:
+    data = _get(f"{BASE_URL}/v3/reference/tickers/{ticker}")
+    results = data.get("results", {})
+    return results.get("weighted_shares_outstanding") or results.get("share_class_shares_outstanding")
+
+def fetch_grouped_aggs(day: str) -> List[Dict[str, Any]]:
+    data = _get(f"{BASE_URL}/v2/aggs/grouped/locale/us/market/stocks/{day}", params={"adjusted": "true"})
+    return data.get("results", [])
+
+def load_grouped_day(day: date, today: date) -> pd.DataFrame:
+    """Grouped daily bars for `day`; completed sessions are kept on disk as Parquet."""
+    def fetch() -> pd.DataFrame:
+        return pd.DataFrame(fetch_grouped_aggs(f"{day:%Y-%m-%d}"), columns=GROUPED_COLUMNS)
+
+    if day >= today:
+        return fetch()
+    return cached_frame(GROUPED_CACHE_DIR / f"{day:%Y-%m-%d}.parquet", fetch)
+
+def fetch_grouped_history(end: date, days: int = 30) -> pd.DataFrame:
+    """Daily bars for every U.S. ticker over the `days` calendar days up to `end`, one row per ticker-day."""
+    start = end - timedelta(days=days)
+    dates = [end - timedelta(days=n) for n in range(days + 1)]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        frames = list(pool.map(lambda d: load_grouped_day(d, end), dates))
+    for path in GROUPED_CACHE_DIR.glob("*.parquet"):
+        if path.stem < f"{start:%Y-%m-%d}":
+            path.unlink(missing_ok=True)
+    # Weekends and holidays come back empty; leave them out so column dtypes stay numeric.
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=GROUPED_COLUMNS)
+
+def _fetch_news_pages(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Follow `next_url` until every requested ticker has an article or the pages run out."""
+    missing = set(params["ticker.any_of"].split(","))
+    results: List[Dict[str, Any]] = []
+    data = _fetch(url, params)
+    while True:
+        page = data.get("results", [])
+        results.extend(page)
+        for art in page:
+            missing.difference_update(art.get("tickers", []))
+        next_url = data.get("next_url")
+        if not missing or not next_url:
+            return {"results": results}
+        # next_url carries the cursor and the original query, but not the key.
+        data = _fetch(next_url, {})
+
+def fetch_news_bulk(tickers: List[str], since: date) -> Dict[str, List[Dict[str, Any]]]:
+    """Recent articles for `tickers`, newest first, grouped by ticker."""
+    url = f"{BASE_URL}/v2/reference/news"
+    news: Dict[str, List[Dict[str, Any]]] = {}
+    for i in range(0, len(tickers), NEWS_BATCH):
+        chunk = tickers[i:i + NEWS_BATCH]
+        # Cache the merged pages, not just the first one.
+        data = cached_get(url, {
+            "ticker.any_of": ",".join(chunk),
+            "published_utc.gte": since.isoformat(),
+            "order": "desc",
+            "sort": "published_utc",
+            "limit": 1000,
+        }, _cache_ttl(url), _fetch_news_pages)
+        for art in data.get("results", []):
+            for t in art.get("tickers", []):
+                news.setdefault(t, []).append(art)
+    return news
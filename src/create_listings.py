@@ -1,4 +1,4 @@
-import pandas as pd
+import csv
 from pathlib import Path
 from utils import load_phrases
 
@@ -19,35 +19,49 @@ DESC = {
     "shirt": "Subtle pocket tee with '{p}'. Soft, everyday fit with minimalist text. Printed on demand.",
 }
 
-def build_tags(prod, colour, phrase):
-    base = {
-        "mug": ["mug","coffee","cup"],
-        "sign":["sign","wooden","home decor","desk"],
-        "shirt":["tshirt","shirt","pocket","casual"],
-    }[prod]
-    extra = ["minimalist","typography","black and white","funny","gift","humor", colour]
-    words = [w.lower().strip("'\"") for w in phrase.split()]
-    return ", ".join(base + extra + words)
+BASE_TAGS = {
+    "mug": ["mug","coffee","cup"],
+    "sign":["sign","wooden","home decor","desk"],
+    "shirt":["tshirt","shirt","pocket","casual"],
+}
+EXTRA_TAGS = ["minimalist","typography","black and white","funny","gift","humor"]
+
+# Everything but the phrase words is fixed per product/colour, so join it once.
+TAG_PREFIX = {(prod, colour): ", ".join(BASE_TAGS[prod] + EXTRA_TAGS + [colour]) for prod, colour, _ in PRODUCTS}
+
+COLOUR_TITLE = {
+    "white": "Black Text, White Background",
+    "black": "White Text, Black Background",
+}
+
+FIELDS = ["phrase", "product_type", "colour", "title", "description", "tags"]
+
+def phrase_tags(phrase):
+    return ", ".join(w.lower().strip("'\"") for w in phrase.split())
+
+def build_tags(prod, colour, words):
+    return f"{TAG_PREFIX[prod, colour]}, {words}"
 
 def main():
     phrases = load_phrases("phrases.txt")
-    rows = []
-    for phrase in phrases:
-        for prod, colour, nicename in PRODUCTS:
-            title = f'{nicename} – "{phrase}" ({ "Black Text, White Background" if colour=="white" else "White Text, Black Background"})'
-            rows.append({
-                "phrase": phrase,
-                "product_type": prod,
-                "colour": colour,
-                "title": title,
-                "description": DESC[prod].format(p=phrase),
-                "tags": build_tags(prod, colour, phrase)
-            })
-    import pandas as pd
-    df = pd.DataFrame(rows)
     out_path = OUT / "listings.csv"
-    df.to_csv(out_path, index=False)
-    print(f"Wrote {len(df)} listing rows to {out_path.resolve()}")
+    n = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\n")
+        w.writeheader()
+        for phrase in phrases:
+            words = phrase_tags(phrase)
+            for prod, colour, nicename in PRODUCTS:
+                w.writerow({
+                    "phrase": phrase,
+                    "product_type": prod,
+                    "colour": colour,
+                    "title": f'{nicename} – "{phrase}" ({COLOUR_TITLE[colour]})',
+                    "description": DESC[prod].format(p=phrase),
+                    "tags": build_tags(prod, colour, words)
+                })
+                n += 1
+    print(f"Wrote {n} listing rows to {out_path.resolve()}")
 
 if __name__ == "__main__":
     main()
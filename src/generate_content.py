@@ -12,13 +12,16 @@ IDEAS = [
      "Wear the pocket tee with '{p}'. POV: point to pocket whenever someone annoys you. Wink outro."),
 ]
 
+# Split each script on its placeholder once; rendering is then a single join.
+TEMPLATES = [(cap, script.split("{p}")) for cap, script in IDEAS]
+
 def main():
     phrases = load_phrases("phrases.txt")
     lines = []
     for i, p in enumerate(phrases, 1):
         lines.append(f"Phrase {i}: {p}\n")
-        for j, (cap, script) in enumerate(IDEAS, 1):
-            lines.append(f"Idea {j}:\nCaption: {cap}\nScript: {script.format(p=p)}\n\n")
+        for j, (cap, parts) in enumerate(TEMPLATES, 1):
+            lines.append(f"Idea {j}:\nCaption: {cap}\nScript: {p.join(parts)}\n\n")
         lines.append("\n")
     out = OUT / "content.txt"
     out.write_text("".join(lines), encoding="utf-8")
@@ -1,51 +1,246 @@
-from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 from pathlib import Path
-from textwrap import wrap
 from utils import load_phrases, slugify
 
 OUT = Path("mockups")
-OUT.mkdir(parents=True, exist_ok=True)
 
-def draw_box(text: str, w: int, h: int, fg: str, bg: str, pad=40):
-    img = Image.new("RGB", (w, h), bg)
-    draw = ImageDraw.Draw(img)
-    font_size = max(20, int(h * 0.10))
+# Mostly-flat text art compresses nearly as well at zlib level 1 as at the
+# default 6, for a fraction of the encode time.
+COMPRESS_LEVEL = 1
+
+SAVE_OPTIONS = {
+    "png":  {"format": "PNG", "compress_level": COMPRESS_LEVEL, "optimize": False},
+    # Lossless WebP encodes slower than the palette PNGs but comes out about a
+    # third of the size; quality 50 / method 1 was both faster and smaller than
+    # the nominal "fastest" quality 0 / method 0 on these images.
+    "webp": {"format": "WEBP", "lossless": True, "quality": 50, "method": 1},
+}
+
+FONT = "DejaVuSans.ttf"
+# Bump whenever the rendering itself changes so existing outputs get redrawn.
+RENDER_VERSION = "v2"
+
+COLOURWAYS = [
+    # name,   fg,      bg
+    ("white", "black", "white"),
+    ("black", "white", "black"),
+]
+
+SIZES = [
+    ("mug",   1200, 1200),  # square
+    ("sign",  1800, 600),   # wide
+    ("shirt", 1200, 1600),  # portrait
+]
+
+@lru_cache(maxsize=32)
+def _get_font(size: int):
     try:
-        font = ImageFont.truetype("DejaVuSans.ttf", font_size)
-    except:
-        font = ImageFont.load_default()
+        return ImageFont.truetype(FONT, size)
+    except OSError:
+        return ImageFont.load_default()
+
+def _font_size(h: int) -> int:
+    return max(20, int(h * 0.10))
+
+def _font_id(size: int) -> str:
+    """The font file that actually loaded, or "default" for Pillow's built-in fallback."""
+    path = getattr(_get_font(size), "path", None)
+    return path if isinstance(path, str) else "default"
+
+@lru_cache(maxsize=8)
+def _canvas(w: int, h: int):
+    img = Image.new("L", (w, h), 0)
+    return img, ImageDraw.Draw(img)
+
+@lru_cache(maxsize=4096)
+def _glyph(size: int, ch: str):
+    """Pre-rasterised coverage bitmap of one character and its offset from the pen position."""
+    font = _get_font(size)
+    l, t, r, b = font.getbbox(ch)
+    if r <= l or b <= t:
+        return None, (0, 0)
+    im = Image.new("L", (r - l, b - t), 0)
+    ImageDraw.Draw(im).text((-l, -t), ch, font=font, fill=255)
+    return im, (l, t)
+
+@lru_cache(maxsize=8192)
+def _advance(size: int, text: str) -> float:
+    return _get_font(size).getlength(text)
+
+def _draw_line(img, draw, xy, ln: str, size: int):
+    """draw.text() from cached glyph bitmaps; pixel-identical for Pillow's basic layout."""
+    font = _get_font(size)
+    if getattr(font, "layout_engine", None) != ImageFont.Layout.BASIC:
+        # Complex shaping (raqm) may merge or reorder glyphs; leave layout to Pillow.
+        draw.text(xy, ln, fill=255, font=font); return
+    x, y = xy
+    pen = 0.0
+    for i, ch in enumerate(ln):
+        if i:
+            # Pair width minus this glyph's advance = previous advance plus their kerning.
+            pen += _advance(size, ln[i-1:i+1]) - _advance(size, ch)
+        glyph, (ox, oy) = _glyph(size, ch)
+        if glyph is not None:
+            img.paste(255, (x + int(pen + 0.5) + ox, y + oy), glyph)
+
+def _wrap(chunk: str, font, max_w: float):
+    """Greedy word wrap on rendered pixel width; a word wider than max_w gets its own line."""
+    lines, cur, cur_w = [], [], 0.0
+    space = font.getlength(" ")
+    for word in chunk.split():
+        ww = font.getlength(word)
+        if cur and cur_w + space + ww > max_w:
+            lines.append(" ".join(cur))
+            cur, cur_w = [word], ww
+        else:
+            cur_w += (space if cur else 0) + ww
+            cur.append(word)
+    if cur:
+        lines.append(" ".join(cur))
+    return lines
+
+def draw_box_mask(text: str, w: int, h: int, pad=40):
+    """Coverage mask of the centred text: 255 where ink goes, 0 for background.
+
+    The mask is a shared per-size canvas, valid until the next call with the same size."""
+    img, draw = _canvas(w, h)
+    img.paste(0, (0, 0, w, h))
+    font_size = _font_size(h)
+    font = _get_font(font_size)
     lines = []
     for chunk in text.split("\n"):
-        guess = max(10, int(len(chunk) * (font_size / 14)))
-        for line in wrap(chunk, width=guess):
-            lines.append(line)
-    dummy = ImageDraw.Draw(Image.new("RGB", (w, h)))
-    sizes = [dummy.textbbox((0,0), ln, font=font) for ln in lines]
-    tw = max((bx[2]-bx[0]) for bx in sizes) if sizes else 0
-    th = sum((bx[3]-bx[1]) for bx in sizes) + (len(lines)-1)*6
-    x = (w - tw)//2
+        lines.extend(_wrap(chunk, font, w - 2*pad))
+    ascent, descent = font.getmetrics()
+    lh = ascent + descent
+    widths = [font.getlength(ln) for ln in lines]
+    tw = max(widths) if widths else 0
+    th = lh*len(lines) + (len(lines)-1)*6
+    x = int(w - tw)//2
     y = (h - th)//2
     for ln in lines:
-        bbox = draw.textbbox((0,0), ln, font=font)
-        lh = bbox[3]-bbox[1]
-        draw.text((x, y), ln, fill=fg, font=font)
+        _draw_line(img, draw, (x, y), ln, font_size)
         y += lh + 6
     return img
 
-def save_pair(phrase: str, base_name: str, w: int, h: int):
+def colourway(mask, fg: str, bg: str):
+    """Palette image using the mask values as indices into a bg->fg ramp."""
+    f, b = ImageColor.getrgb(fg), ImageColor.getrgb(bg)
+    img = Image.frombytes("P", mask.size, mask.tobytes())
+    img.putpalette([round(bc + (fc - bc) * i / 255) for i in range(256) for fc, bc in zip(f, b)])
+    return img
+
+def write_image(img, path: Path, fmt: str):
+    """Encode in memory, write it in one go to a temp file, then rename it into place.
+
+    Readers, and the exists() check in save_pair, never see a half-written image."""
+    buf = io.BytesIO()
+    img.save(buf, **SAVE_OPTIONS[fmt])
+    data = buf.getbuffer()
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def _render_key(phrase: str, w: int, h: int, fg: str, bg: str) -> str:
+    raw = f"{phrase}|{w}x{h}|{fg}|{bg}|{_font_id(_font_size(h))}|{RENDER_VERSION}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+# "{base}_{colourway}_{slug}_{key}" -> "{base}_{colourway}_{slug}"
+_KEYED_STEM = re.compile(r"(.+)_[0-9a-f]{16}")
+
+def save_pair(phrase: str, slug: str, base_name: str, w: int, h: int, fmt: str = "png"):
+    """Render any missing colourways of one (phrase, size).
+
+    Returns (current, written): every output path under the current render key,
+    and the subset that had to be drawn this time."""
+    current, todo = [], []
+    for name, fg, bg in COLOURWAYS:
+        path = OUT / f"{base_name}_{name}_{slug}_{_render_key(phrase, w, h, fg, bg)}.{fmt}"
+        current.append(path)
+        if not path.exists():
+            todo.append((path, fg, bg))
+    if todo:
+        mask = draw_box_mask(phrase, w, h)
+        for path, fg, bg in todo:
+            write_image(colourway(mask, fg=fg, bg=bg), path, fmt)
+    return current, [path for path, _, _ in todo]
+
+def render_phrase_all(phrase: str, fmt: str = "png"):
+    """Every size and colourway of one phrase; the worker-process unit of work."""
     slug = slugify(phrase)
-    draw_box(phrase, w, h, fg="black", bg="white").save(OUT / f"{base_name}_white_{slug}.png")
-    draw_box(phrase, w, h, fg="white", bg="black").save(OUT / f"{base_name}_black_{slug}.png")
+    current, written = [], []
+    for base_name, w, h in SIZES:
+        c, wr = save_pair(phrase, slug, base_name, w, h, fmt)
+        current += c
+        written += wr
+    return current, written
+
+def prune_stale(current, fmt: str):
+    """Delete outputs of the same size, colourway and phrase left over from an older render key."""
+    names = {p.name for p in current}
+    stems = {_KEYED_STEM.fullmatch(p.stem).group(1) for p in current}
+    stale = []
+    for p in OUT.glob(f"*.{fmt}"):
+        if p.name in names:
+            continue
+        m = _KEYED_STEM.fullmatch(p.stem)
+        # Unkeyed names are what the script wrote before outputs carried a key.
+        if (m.group(1) if m else p.stem) in stems:
+            p.unlink(missing_ok=True)
+            stale.append(p)
+    return stale
+
+def optimize_pngs(paths):
+    """Recompress finished PNGs for size with oxipng, which parallelises internally."""
+    exe = shutil.which("oxipng")
+    if not exe:
+        print("oxipng not found on PATH; skipping --optimize"); return
+    subprocess.run([exe, "-o", "2", "--strip", "safe", "-t", str(os.cpu_count()), *map(str, paths)], check=True)
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate text mock-ups for every phrase in phrases.txt.")
+    parser.add_argument("--format", choices=sorted(SAVE_OPTIONS), default="png",
+                        help="output image format (default: png)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="shrink every current PNG, not only new ones, with oxipng (slower, smaller files)")
+    args = parser.parse_args()
+    if args.optimize and args.format != "png":
+        parser.error("--optimize only applies to --format png")
+
     phrases = load_phrases("phrases.txt")
     if not phrases:
-        print("No phrases found in phrases.txt"); return
-    for p in phrases:
-        save_pair(p, "mug",   1200, 1200)  # square
-        save_pair(p, "sign",  1800, 600)   # wide
-        save_pair(p, "shirt", 1200, 1600)  # portrait
-    print(f"Generated mock-ups for {len(phrases)} phrase(s) in {OUT.resolve()}")
+        sys.exit("No phrases found in phrases.txt")
+    OUT.mkdir(parents=True, exist_ok=True)
+    # PNG encoding holds the GIL, so spread the work over processes, not threads.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        render = partial(render_phrase_all, fmt=args.format)
+        current, written = [], []
+        for c, wr in pool.map(render, phrases, chunksize=4):
+            current += c
+            written += wr
+    stale = prune_stale(current, args.format)
+    if args.optimize:
+        optimize_pngs(current)
+    print(f"Generated {len(written)} new mock-up(s) for {len(phrases)} phrase(s) in {OUT.resolve()}"
+          + (f"; removed {len(stale)} stale" if stale else ""))
 
 if __name__ == "__main__":
     main()
@@ -6,10 +6,17 @@ def load_phrases(path: str) -> List[str]:
     if not os.path.exists(path):
         return []
     with open(path, "r", encoding="utf-8") as f:
-        return [ln.strip() for ln in f if ln.strip()]
+        data = f.read()
+    return [ln for ln in map(str.strip, data.split("\n")) if ln]
+
+_STRIP = re.compile(r"[^\w\s-]+")
+_WS = re.compile(r"\s+")
+# ASCII fast path: delete everything the regex would strip, in one C pass.
+_ASCII_DROP = str.maketrans({c: None for c in map(chr, range(128))
+                             if not (c.isalnum() or c.isspace() or c in "_-")})
 
 def slugify(s: str) -> str:
     s = s.lower()
-    s = re.sub(r"[^\w\s-]+", "", s)
-    s = re.sub(r"\s+", "_", s).strip("_")
-    return s
+    if s.isascii():
+        return "_".join(s.translate(_ASCII_DROP).split()).strip("_")
+    return _WS.sub("_", _STRIP.sub("", s)).strip("_")